@@ -1,8 +1,11 @@
 # Adapted from Animation Starter Code at 
 # http://www.cs.cmu.edu/~112n18/notes/notes-animations-part2.html
 
-from tkinter import *
-from gamescreens import *
+import time
+launchTime = time.perf_counter()
+import os, sys
+from gamescreens import ModeSelect
+importTime = time.perf_counter() - launchTime
 
 def getElements():
     """
@@ -10,7 +13,8 @@ def getElements():
     element's corresponding color within the game.
     """
     pTable, pTableColor = [], []
-    with open('pTable.csv', 'r') as f:
+    folder = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(folder, 'pTable.csv'), 'r') as f:
         for line in f.readlines():
             if line.startswith('#'): continue
             line = line.split(',')
@@ -25,7 +29,7 @@ def init(data):
     data: Struct
     """
     data.bgColor = '#800000'
-    data.pTable, data.pTableColor = getElements()
+    data.pTable, data.pTableColor = None, None
     data.margin = 0
     data.cx, data.cy, data.r = data.width / 2, data.height / 2, data.width / 2
     data.cirR = 30
@@ -58,7 +62,7 @@ def timerFired(data):
     data: Struct
     """
     for elem in data.removal:
-        data.screen.board.elems.remove(elem)
+        data.screen.board.removeElem(elem)
     data.removal = []
     data.screen.timerFired(data)
 
@@ -71,12 +75,31 @@ def redrawAll(canvas, data):
     """
     data.screen.draw(canvas, data)
 
-def run(width=300, height=300):
+def profileStep(data, label, start):
     """
-    Initializes window GUI and canvas using the Tkinter library.
+    Reports how long a startup step took if startup profiling is enabled, and
+    returns the current time so that the next step can be measured.
+
+    data: Struct
+    label: str
+    start: float
+    """
+    now = time.perf_counter()
+    if data.startupProfile:
+        print('startup: %s %.1f ms' % (label, (now - start) * 1000),
+            file=sys.stderr)
+    return now
+
+def run(width=300, height=300, startupProfile=False):
+    """
+    Initializes window GUI and canvas using the Tkinter library. The mode 
+    selection screen is drawn as soon as the window exists, before the 
+    element table is loaded; the game modes themselves are only imported 
+    once a mode is selected.
 
     width: int
     height: int
+    startupProfile: bool
     """
     def redrawAllWrapper(canvas, data):
         canvas.delete(ALL)
@@ -104,13 +127,27 @@ def run(width=300, height=300):
     data.width = width
     data.height = height
     data.timerDelay = 100 # milliseconds
+    data.startupProfile = startupProfile
+    start = time.perf_counter()
+    if startupProfile:
+        print('startup: imports %.1f ms' % (importTime * 1000), file=sys.stderr)
+    from tkinter import Tk, Canvas, ALL
+    start = profileStep(data, 'import tkinter', start)
+    # create the root and the canvas
     root = Tk()
     root.title("TkAtomas") # window title
     init(data)
-    # create the root and the canvas
     canvas = Canvas(root, width=data.width, height=data.height)
     canvas.configure(bd=0, highlightthickness=0)
     canvas.pack()
+    start = profileStep(data, 'create window', start)
+    # draw the mode selection screen before loading anything else
+    redrawAllWrapper(canvas, data)
+    start = profileStep(data, 'first frame', start)
+    profileStep(data, 'time to first frame (excluding interpreter startup)',
+        launchTime)
+    data.pTable, data.pTableColor = getElements()
+    start = profileStep(data, 'load elements', start)
     # set up events
     root.bind("<Button-1>", lambda event:
                             mousePressedWrapper(event, canvas, data))
@@ -121,4 +158,4 @@ def run(width=300, height=300):
     root.mainloop()  # blocks until window is closed
 
 if __name__ == "__main__":
-    run(400, 600)
\ No newline at end of file
+    run(400, 600, startupProfile='--startup-profile' in sys.argv)
\ No newline at end of file
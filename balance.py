@@ -0,0 +1,299 @@
+# Balance analysis (e.g. rule parameter sweeps, headless games, score reports)
+import argparse, csv, itertools, math, multiprocessing, random, statistics
+import sys
+import atomas
+from core_graphics import Atom
+from event_handling import Classic, TimeAttack, Geneva, Zen
+from hints import HintSearch, legalMoves, snapshot
+
+MODES = {'classic': Classic, 'timeattack': TimeAttack, 'geneva': Geneva,
+    'zen': Zen}
+# Rule parameters that can be swept, with their defaults
+PARAMS = {'nMin': 1, 'nMax': 3, 'neutrinoScore': Classic.neutrinoScore,
+    'protonRate': Classic.protonRate, 'electronRate': Classic.electronRate,
+    'startTime': TimeAttack.startTime, 'fusionBonus': TimeAttack.fusionBonus,
+    'bigFusionBonus': TimeAttack.bigFusionBonus}
+# Rule parameters that only Time Attack reads
+TIME_ATTACK_PARAMS = ['startTime', 'fusionBonus', 'bigFusionBonus']
+RESULTS = ['score', 'moves', 'ticks', 'maxElement', 'capped']
+SUMMARY = ['games', 'meanScore', 'p10Score', 'medianScore', 'p90Score',
+    'meanMoves', 'meanMaxElement', 'maxElement']
+
+def parseValues(text):
+    """
+    Returns the values listed for a parameter, given as comma-separated
+    integers or inclusive ranges written as start:stop or start:stop:step.
+
+    text: str
+    """
+    values = []
+    for item in text.split(','):
+        if ':' in item:
+            bounds = [int(bound) for bound in item.split(':')]
+            step = bounds[2] if len(bounds) > 2 else 1
+            values += list(range(bounds[0], bounds[1] + 1, step))
+        else: values.append(int(item))
+    return values
+
+def usesParam(mode, name):
+    """
+    Checks whether games in the given mode read a rule parameter.
+
+    mode: str
+    name: str
+    """
+    return mode == 'timeattack' or name not in TIME_ATTACK_PARAMS
+
+def makeGrid(modes, params):
+    """
+    Returns every combination of mode and the rule parameters that mode reads
+    as a list of (mode, rules) cells, leaving out spawn ranges where nMin 
+    exceeds nMax. Parameters that are not swept or not read keep their 
+    defaults.
+
+    modes: list
+    params: dict
+    """
+    names, grid = list(PARAMS), []
+    for mode in modes:
+        choices = [params.get(name, [PARAMS[name]])
+            if usesParam(mode, name) else [PARAMS[name]] for name in names]
+        grid += [(mode, dict(zip(names, values)))
+            for values in itertools.product(*choices)]
+    return [(mode, rules) for mode, rules in grid
+        if rules['nMin'] <= rules['nMax']]
+
+def makeData():
+    """
+    Returns the game metadata needed to play games without a window.
+    """
+    class Struct(object): pass
+    data = Struct()
+    data.width, data.height = 400, 600
+    data.startupProfile = False
+    atomas.init(data)
+    data.pTable, data.pTableColor = atomas.getElements()
+    return data
+
+def chooseMove(game, policy, depth):
+    """
+    Returns the move a simulated player makes: the hint engine's best move
+    when the policy is 'greedy', or any legal move when it is 'random'. 
+    Returns None if there is no legal move.
+
+    game: Game
+    policy: str
+    depth: int
+    """
+    position = snapshot(game)
+    moves = legalMoves(*position[:2])
+    if not moves: return None
+    elif policy == 'random': return random.choice(moves)
+    return HintSearch(position).bestMove(depth)
+
+def playGame(data, mode, rules, seed, options):
+    """
+    Plays one seeded game without a window and returns its results. Each tick
+    runs the same rules as the GUI's timerFired, and the player moves once
+    the board has settled and thinkTicks ticks have passed. The max element 
+    is sampled after every tick that changed the board, so fusions resolved 
+    after the last move are counted.
+
+    data: Struct
+    mode: str
+    rules: dict
+    seed: int
+    options: argparse.Namespace
+    """
+    random.seed(seed)
+    game = MODES[mode](data, False, rules=rules)
+    data.screen, data.removal = game, []
+    moves = ticks = idle = maxElement = 0
+    while data.screen is game and moves < options.maxMoves:
+        changed = bool(game.board.dirty or data.removal)
+        atomas.timerFired(data)
+        ticks += 1
+        if changed:
+            maxElement = max([maxElement] + [elem.n
+                for elem in game.board.elems if isinstance(elem, Atom)])
+        idle = 0 if game.board.dirty else idle + 1
+        if data.screen is not game or idle < options.thinkTicks: continue
+        move = chooseMove(game, options.policy, options.depth)
+        if move == None:
+            raise RuntimeError('no legal move in %s game with seed %d' %
+                (mode, seed))
+        game.playMove(data, move)
+        moves, idle = moves + 1, 0
+    return {'score': game.score, 'moves': moves, 'ticks': ticks,
+        'maxElement': maxElement, 'capped': int(moves >= options.maxMoves)}
+
+def runCell(task):
+    """
+    Plays every seeded game for one cell of the grid in a worker process and
+    returns one result row per game.
+
+    task: tuple
+    """
+    cell, mode, rules, options = task
+    data = makeData()
+    rows = []
+    for seed in range(options.seed, options.seed + options.games):
+        row = {'cell': cell, 'mode': mode, 'seed': seed}
+        row.update(rules)
+        row.update(playGame(data, mode, rules, seed, options))
+        rows.append(row)
+    return rows
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile of a sorted list using the nearest rank.
+
+    values: list
+    q: num
+    """
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+def summarize(rows):
+    """
+    Returns the distribution of score, game length and max element for a
+    group of result rows.
+
+    rows: list
+    """
+    scores = sorted(row['score'] for row in rows)
+    return {'games': len(rows), 'meanScore': statistics.mean(scores),
+        'p10Score': percentile(scores, 10),
+        'medianScore': percentile(scores, 50),
+        'p90Score': percentile(scores, 90),
+        'meanMoves': statistics.mean(row['moves'] for row in rows),
+        'meanMaxElement': statistics.mean(row['maxElement'] for row in rows),
+        'maxElement': max(row['maxElement'] for row in rows)}
+
+def printTable(title, header, lines):
+    """
+    Prints a table with aligned columns.
+
+    title: str
+    header: list
+    lines: list
+    """
+    cells = [header] + [['%.1f' % v if isinstance(v, float) else str(v)
+        for v in line] for line in lines]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(header))]
+    print('\n' + title)
+    for line in cells:
+        print('  '.join(v.rjust(w) for v, w in zip(line, widths)))
+
+def sweep(options):
+    """
+    Shards the grid across worker processes, streams every game's results to
+    a CSV file as cells finish, and writes one summary row per cell. Every
+    cell plays the same seeds, so cells differ only in their rules.
+
+    options: argparse.Namespace
+    """
+    grid = makeGrid(options.modes, options.params)
+    tasks = [(cell, mode, rules, options)
+        for cell, (mode, rules) in enumerate(grid)]
+    columns = ['cell', 'mode'] + list(PARAMS) + ['seed'] + RESULTS
+    chunksize = max(1, len(tasks) // (options.workers * 4))
+    byCell = {}
+    with open(options.out, 'w', newline='') as f, \
+        multiprocessing.Pool(options.workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for rows in pool.imap_unordered(runCell, tasks, chunksize):
+            writer.writerows(rows)
+            f.flush()
+            byCell[rows[0]['cell']] = summarize(rows)
+    summaryColumns = ['cell', 'mode'] + list(PARAMS) + SUMMARY
+    with open(options.summary, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=summaryColumns)
+        writer.writeheader()
+        for cell, (mode, rules) in enumerate(grid):
+            row = {'cell': cell, 'mode': mode}
+            row.update(rules)
+            row.update(byCell[cell])
+            writer.writerow(row)
+    report(grid, byCell, options)
+
+def report(grid, byCell, options):
+    """
+    Prints the mean of each cell statistic for every value of each swept
+    parameter, over the cells whose mode reads that parameter, along with the
+    best and worst cells by mean score.
+
+    grid: list
+    byCell: dict
+    options: argparse.Namespace
+    """
+    header = ['value', 'cells', 'meanScore', 'medianScore', 'meanMoves',
+        'meanMaxElement']
+    swept = ['mode'] * (len(options.modes) > 1) + [name for name in PARAMS
+        if len(options.params.get(name, [])) > 1]
+    for name in swept:
+        groups = {}
+        for cell, (mode, rules) in enumerate(grid):
+            if name != 'mode' and not usesParam(mode, name): continue
+            value = mode if name == 'mode' else rules[name]
+            groups.setdefault(value, []).append(byCell[cell])
+        if not groups: continue
+        lines = [[value, len(stats)] + [statistics.mean(s[key] for s in stats)
+            for key in header[2:]] for value, stats in sorted(groups.items())]
+        printTable(name, header, lines)
+    ranked = sorted(byCell, key=lambda cell: -byCell[cell]['meanScore'])
+    if len(ranked) > 10: ranked = ranked[:5] + ranked[-5:]
+    lines = [[cell, grid[cell][0], byCell[cell]['meanScore'],
+        byCell[cell]['medianScore'], byCell[cell]['meanMoves'],
+        byCell[cell]['maxElement']] for cell in ranked]
+    printTable('best and worst cells (see %s)' % options.summary,
+        ['cell', 'mode', 'meanScore', 'medianScore', 'meanMoves', 'maxElement'],
+        lines)
+
+def parseArgs(argv):
+    """
+    Parses the command line options for a sweep.
+
+    argv: list
+    """
+    parser = argparse.ArgumentParser(description='Sweeps TkAtomas rule '
+        'parameters over seeded headless games and reports game balance.')
+    parser.add_argument('--grid', action='append', default=[],
+        metavar='NAME=VALUES', help='values to sweep for a rule parameter, '
+        'e.g. nMax=3,4 or protonRate=8:16:2; one of: %s' % ', '.join(PARAMS))
+    parser.add_argument('--modes', default='classic',
+        help='comma-separated modes: %s' % ', '.join(MODES))
+    parser.add_argument('--games', type=int, default=20,
+        help='seeded games per cell')
+    parser.add_argument('--seed', type=int, default=0, help='first seed')
+    parser.add_argument('--policy', choices=['greedy', 'random'],
+        default='greedy', help='how the simulated player picks moves')
+    parser.add_argument('--depth', type=int, default=2,
+        help='search depth of the greedy policy')
+    parser.add_argument('--think-ticks', dest='thinkTicks', type=int,
+        default=10, help='timer ticks the player waits before each move')
+    parser.add_argument('--max-moves', dest='maxMoves', type=int,
+        default=2000, help='moves after which a game is stopped')
+    parser.add_argument('--workers', type=int,
+        default=multiprocessing.cpu_count(), help='worker processes')
+    parser.add_argument('--out', default='balance.csv',
+        help='CSV file with one row per game')
+    parser.add_argument('--summary', default='balance_summary.csv',
+        help='CSV file with one row per cell')
+    options = parser.parse_args(argv)
+    options.modes = options.modes.split(',')
+    for mode in options.modes:
+        if mode not in MODES: parser.error('unknown mode: %s' % mode)
+    options.params = {}
+    for item in options.grid:
+        name, _, values = item.partition('=')
+        if name not in PARAMS: parser.error('unknown parameter: %s' % name)
+        try: options.params[name] = parseValues(values)
+        except ValueError: parser.error('invalid values: %s' % item)
+    if options.games < 1: parser.error('--games must be at least 1')
+    if options.workers < 1: parser.error('--workers must be at least 1')
+    options.thinkTicks = max(1, options.thinkTicks)
+    return options
+
+if __name__ == "__main__":
+    sweep(parseArgs(sys.argv[1:]))
@@ -147,11 +147,13 @@ class Luxon(Cir):
 class Gameboard(object):
     def __init__(self):
         """
-        Creates an empty gameboard.
+        Creates an empty gameboard. The indices of slots that have changed 
+        since the last fusion check are kept in dirty.
         """
         self.center = None
         self.elems = []
         self.dAngle = None
+        self.dirty = set()
 
     def addElem(self, loc, elem):
         """
@@ -161,11 +163,80 @@ class Gameboard(object):
         loc: pos int
         elem: Cir
         """
-        self.elems.insert(loc - 1, elem)
+        i = loc - 1
+        self.elems.insert(i, elem)
+        self.dirty = {j + 1 if j >= i else j for j in self.dirty}
+        self.dirty.add(i)
+
+    def removeElem(self, elem):
+        """
+        Removes the given element from the board, marking the two elements 
+        that become neighbors as changed.
+
+        elem: Cir
+        """
+        i = self.index(elem) - 1
+        self.elems.pop(i)
+        self.dirty = {j - 1 if j > i else j for j in self.dirty if j != i}
+        if self.elems:
+            self.dirty.add((i - 1) % len(self.elems))
+            self.dirty.add(i % len(self.elems))
+
+    def replaceElem(self, loc, elem):
+        """
+        Replaces the element at the specified index, starting at 1.
+
+        loc: pos int
+        elem: Cir
+        """
+        self.elems[loc - 1] = elem
+        self.dirty.add(loc - 1)
+
+    def symmetricCount(self, i):
+        """
+        Returns the number of pairs of atoms of the same element spaced 
+        symmetrically around index i.
+
+        i: int
+        """
+        count, n = 0, len(self.elems)
+        while count < (n - 1) // 2:
+            left = self.elems[(i - count - 1) % n]
+            right = self.elems[(i + count + 1) % n]
+            if left != right: break
+            count += 1
+        return count
+
+    def dirtyProtons(self):
+        """
+        Returns the indices of the protons whose symmetric neighborhood may 
+        contain a changed slot. A proton's neighborhood ends at the first 
+        element that is not an atom, so only the nearest proton on either side
+        of each changed slot, within half the ring, needs to be checked.
+        """
+        protons, n = set(), len(self.elems)
+        for i in self.dirty:
+            if isinstance(self.elems[i], Proton):
+                protons.add(i)
+                continue
+            for step in (-1, 1):
+                for j in range(1, n // 2 + 1):
+                    if isinstance(self.elems[(i + step*j) % n], Proton):
+                        protons.add((i + step*j) % n)
+                        break
+                    elif not isinstance(self.elems[(i + step*j) % n], Atom):
+                        break
+        return sorted(protons)
 
     def index(self, target):
-        for elem, i in enumerate(self.elems):
-            if elem == target:
+        """
+        Returns the position of the given element on the board, starting at 1,
+        or -1 if it is not on the board.
+
+        target: Cir
+        """
+        for i, elem in enumerate(self.elems):
+            if elem is target:
                 return i+1
         return -1
 
@@ -199,9 +270,10 @@ class Gameboard(object):
             n = max([elem.n for elem in elemsToFuse if type(elem) == Atom]) \
                 + count
         fusedAtom = Atom(data, self, protonIndex + 1, n)
-        self.elems.insert(iMin, fusedAtom)
+        loc = iMin - (iMax + 1) if iMin > iMax else iMin
         for elem in elemsToFuse:
-            self.elems.remove(elem)
+            self.removeElem(elem)
+        self.addElem(loc + 1, fusedAtom)
 
     def draw(self, canvas, data):
         """
@@ -1,22 +1,34 @@
 # Event handling classes (e.g. gameplay, each mode, mousepress, keypress, time)
 from core_graphics import *
+from hints import HintEngine, snapshot
 import gamescreens, random
 
 class Game(object):
-    def __init__(self, data, difficult, nMin=1, nMax=3, score=0):
+    # Chance out of 60 of spawning a proton or an electron, and the score from
+    # which neutrinos can spawn
+    protonRate, electronRate, neutrinoScore = 12, 5, 750
+    # Whether luxons are spawned instead of protons
+    spawnsLuxons = False
+
+    def __init__(self, data, difficult, nMin=1, nMax=3, score=0, rules=None):
         """
-        Creates a template for a given game mode of Atomas.
+        Creates a template for a given game mode of Atomas. Any rule parameter
+        (e.g. protonRate) can be overridden for this game through rules.
 
         data: Struct
         difficult: bool
         nMin: int
         nMax: int
         score: int
+        rules: dict
         """
         self.difficult, self.nMin, self.nMax = difficult, nMin, nMax
+        if rules != None:
+            for name, value in rules.items(): setattr(self, name, value)
         self.gameOver = False
         self.score = score
         self.board = Gameboard()
+        self.hints = None
         self.board.center = self.spawnPiece(data)
         for i in range(1, 7):
             self.board.addElem(i, self.spawnAtom(data, i))
@@ -39,19 +51,22 @@ class Game(object):
         data: Struct
         """
         pieceType = random.randint(1, 60)
+        electronMax = self.protonRate + self.electronRate
         if not self.difficult:
-            isNeutrino = pieceType == 60 if self.score >= 750 else False
+            isNeutrino = pieceType == 60 \
+                if self.score >= self.neutrinoScore else False
             if isNeutrino: return Neutrino(data, self.board, 0)
-            elif 1 <= pieceType <= 12 and type(self) == Geneva:
+            elif 1 <= pieceType <= self.protonRate and self.spawnsLuxons:
                 return Luxon(data, self.board, 0)
-            elif 1 <= pieceType <= 12:
+            elif 1 <= pieceType <= self.protonRate:
                 return Proton(data, self.board, 0)
-            elif 13 <= pieceType <= 17:
+            elif self.protonRate < pieceType <= electronMax:
                 return Electron(data, self.board, 0)
             # Zen mode probability of spawning proton on last move before 
-            # end of game is half
+            # end of game is half, so the protons taken up by this range and
+            # by protonRate add up to 30 out of 60
             elif type(self) == Zen and len(self.board.elems) == 18 \
-                and 18 <= pieceType <= 35:
+                and electronMax < pieceType <= 30 + self.electronRate:
                 return Proton(data, self.board, 0)
             else: return self.spawnAtom(data, 0)
         else: pass # implement difficult mode
@@ -97,15 +112,58 @@ class Game(object):
                 clicked = elem
         return clicked
 
-    def copyAtom(self, event, data):
+    def copyAtom(self, data, atom):
         """
-        Copies a given element on the gameboard and places it at the center.
+        Copies a given atom on the gameboard and places it at the center.
 
-        event: obj
         data: Struct
+        atom: Atom
+        """
+        self.board.center = Atom(data, self.board, 0, atom.n)
+
+    def convertAtom(self, data, atom):
+        """
+        Turns a given atom on the gameboard into a proton using the luxon at 
+        the center.
+
+        data: Struct
+        atom: Atom
+        """
+        loc = self.board.index(atom)
+        self.board.replaceElem(loc, Proton(data, self.board, loc))
+        self.board.updateElems(data)
+        self.board.center = self.spawnPiece(data)
+
+    def hasTarget(self):
+        """
+        Checks whether the electron, neutrino or luxon at the center can be 
+        used on the gameboard. Electrons can pick up any element, while 
+        neutrinos and luxons need an atom.
+        """
+        if type(self.board.center) == Electron: return len(self.board.elems) > 0
+        return any(isinstance(elem, Atom) for elem in self.board.elems)
+
+    def playMove(self, data, move):
         """
-        if clicked != None:
-            self.board.center = self.selectAtom(event, data)
+        Plays a move without a mouseclick, given in the same form as the moves
+        suggested by the hint engine: ('insert', k) places the center piece 
+        before the element at index k, ('target', k) uses it on the element at
+        index k and ('respawn', 0) swaps it for a new piece.
+
+        data: Struct
+        move: tuple
+        """
+        kind, k = move
+        if kind == 'respawn':
+            self.board.center = self.spawnPiece(data)
+        elif kind == 'insert':
+            self.board.center.move(data, k + 1)
+        elif type(self.board.center) == Neutrino:
+            self.copyAtom(data, self.board.elems[k])
+        elif type(self.board.center) == Electron:
+            self.board.elems[k].move(data, 0)
+        elif type(self.board.center) == Luxon:
+            self.convertAtom(data, self.board.elems[k])
 
     def mousePressed(self, event, data):
         """
@@ -115,51 +173,66 @@ class Game(object):
         event: obj
         data: Struct
         """
-        if type(self.board.center) == Neutrino:
-            self.copyAtom(event, data)
+        if self.hints != None: self.hints.cancel()
+        center = type(self.board.center)
+        if center in (Neutrino, Electron, Luxon) and not self.hasTarget():
+            # nothing to use the piece on, so it is swapped for a new one
+            self.board.center = self.spawnPiece(data)
+        elif type(self.board.center) == Neutrino:
+            clicked = self.selectAtom(event, data)
+            if isinstance(clicked, Atom): self.copyAtom(data, clicked)
         elif type(self.board.center) == Electron:
             clicked = self.selectAtom(event, data)
             if clicked != None: clicked.move(data, 0)
         elif type(self.board.center) == Luxon:
             clicked = self.selectAtom(event, data)
-            if clicked != None:
-                clicked.prevAtom = self
-                clicked = Proton(data, self.board, self.board.index(clicked))
+            if isinstance(clicked, Atom): self.convertAtom(data, clicked)
         else:
             self.selectSpace(event, data)
 
     def keyPressed(self, event, data):
         """
-        Allows the user to quit the current game.
+        Allows the user to quit the current game or toggle hints.
 
         event: obj
         data: Struct
         """
         if event.keysym == 'q':
+            if self.hints != None: self.hints.cancel()
             data.screen = gamescreens.ModeSelect()
+        elif event.keysym == 'h':
+            if self.hints != None:
+                self.hints.cancel()
+                self.hints = None
+            else: self.hints = HintEngine()
+
+    def updateHint(self):
+        """
+        Starts a new hint search whenever the position changes and collects 
+        the best move found so far without blocking.
+        """
+        position = snapshot(self)
+        if position != self.hints.position: self.hints.start(position)
+        self.hints.poll()
     
     def checkForFusion(self, data):
         """
         Checks if atoms of the same element are spaced symmetrically on the 
-        left and right sides of a proton, fusing them together if so.
+        left and right sides of a proton, fusing them together if so. Only the 
+        protons nearest to a slot changed since the last check are considered,
+        so an unchanged board is skipped outright.
 
         data: Struct
         """
-        fuseCount, i, left, right = 0, None, None, None
-        for elem in self.board.elems:
-            if isinstance(elem, Proton):
-                fuseCount, i = 0, self.board.elems.index(elem)
-                left = (i - 1) % len(self.board.elems)
-                right = (i + 1) % len(self.board.elems)
-                if left == right: continue
-                while self.board.elems[left] == self.board.elems[right]:
-                    fuseCount += 1
-                    left = (left - 1) % len(self.board.elems)
-                    right = (right + 1) % len(self.board.elems)
-        if fuseCount > 0:
-            self.board.fuse(data, i, fuseCount)
-            self.score += 10 * fuseCount
-        return fuseCount
+        if not self.board.dirty: return 0
+        for i in self.board.dirtyProtons():
+            fuseCount = self.board.symmetricCount(i)
+            if fuseCount > 0:
+                self.board.fuse(data, i, fuseCount)
+                self.score += 10 * fuseCount
+                return fuseCount
+        self.board.dirty.clear()
+        return 0
 
     def checkGameOver(self):
         """
@@ -170,28 +243,59 @@ class Game(object):
 
     def timerFired(self, data):
         """
-        Updates the gameboard if any atoms need to be fused together and checks
-        whether the game is over.
+        Updates the gameboard if any atoms need to be fused together, checks
+        whether the game is over and refreshes the hint if hints are enabled.
 
         data: Struct
         """
-        self.checkForFusion(data)
-        self.board.updateElems(data)
+        if self.board.dirty:
+            self.checkForFusion(data)
+            self.board.updateElems(data)
         self.checkGameOver()
+        if self.hints != None:
+            if self.gameOver: self.hints.cancel()
+            else: self.updateHint()
         if self.gameOver:
             data.screen = gamescreens.GameOver(self.score, type(self), self.difficult)
 
     def draw(self, canvas, data):
         """
-        Draws the current gameboard on the canvas.
+        Draws the current gameboard on the canvas, highlighting the hinted move
+        if hints are enabled.
 
         canvas: tkinter Canvas
         data: Struct
         """
         self.board.draw(canvas, data)
+        x, y = data.r, 23*data.height/24
+        text = 'Hints on [h]' if self.hints != None else 'Hints off [h]'
+        canvas.create_text(x, y, text=text, font=('Verdana', 14), fill='#fff')
+        if self.hints != None and self.hints.hint != None:
+            self.drawHint(canvas, data, self.hints.hint)
+
+    def drawHint(self, canvas, data, move):
+        """
+        Outlines the element to target, the gap to place the center piece in 
+        or the center piece if it should be swapped for a new one.
+
+        canvas: tkinter Canvas
+        data: Struct
+        move: tuple
+        """
+        kind, k = move
+        if kind == 'respawn': cx, cy = data.cx, data.cy
+        elif kind == 'target':
+            cx, cy = self.board.elems[k].cx, self.board.elems[k].cy
+        else:
+            angle = (k + 0.5) * self.board.dAngle if self.board.elems else 0
+            cx = data.cx + (data.r - data.cirR) * math.cos(angle)
+            cy = data.cy - (data.r - data.cirR) * math.sin(angle)
+        r = data.cirR / 3 if kind == 'insert' else data.cirR + 4
+        canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline='#ff0',
+            width=3)
 
 class Classic(Game):
-    def __init__(self, data, difficult, nMin=1, nMax=3, score=0):
+    def __init__(self, data, difficult, nMin=1, nMax=3, score=0, rules=None):
         """
         Creates a game in Classic mode.
 
@@ -200,11 +304,16 @@ class Classic(Game):
         nMin: int
         nMax: int
         score: int
+        rules: dict
         """
-        super().__init__(data, difficult, nMin, nMax, score)
+        super().__init__(data, difficult, nMin, nMax, score, rules)
 
 class TimeAttack(Game):
-    def __init__(self, data, difficult, nMin=1, nMax=3, score=0):
+    # Starting time in tenths of a second, and the time gained by fusing two 
+    # or more than two pairs of atoms at once
+    startTime, fusionBonus, bigFusionBonus = 150, 20, 30
+
+    def __init__(self, data, difficult, nMin=1, nMax=3, score=0, rules=None):
         """
         Creates a game in Time Attack mode, where the user must fuse atoms at 
         least once every 20 seconds to continue the game.
@@ -214,9 +323,10 @@ class TimeAttack(Game):
         nMin: int
         nMax: int
         score: int
+        rules: dict
         """
-        super().__init__(data, difficult, nMin, nMax, score)
-        self.time = 150
+        super().__init__(data, difficult, nMin, nMax, score, rules)
+        self.time = self.startTime
 
     def checkForFusion(self, data):
         """
@@ -226,8 +336,9 @@ class TimeAttack(Game):
         data: Struct
         """
         fuseCount = super().checkForFusion(data)
-        if fuseCount == 2: self.time += 20
-        elif fuseCount > 2: self.time += 30
+        if fuseCount == 2: self.time += self.fusionBonus
+        elif fuseCount > 2: self.time += self.bigFusionBonus
+        return fuseCount
 
     def timerFired(self, data):
         """
@@ -252,7 +363,9 @@ class TimeAttack(Game):
             font=('Verdana', 16), fill='#fff')
 
 class Geneva(Game):
-    def __init__(self, data, difficult, nMin=1, nMax=3, score=0):
+    spawnsLuxons = True
+
+    def __init__(self, data, difficult, nMin=1, nMax=3, score=0, rules=None):
         """
         Creates an Atomas game in Geneva mode, in which luxons are spawned 
         instead of protons.
@@ -262,11 +375,12 @@ class Geneva(Game):
         nMin: int
         nMax: int
         score: int
+        rules: dict
         """
-        super().__init__(data, difficult, nMin, nMax, score)
+        super().__init__(data, difficult, nMin, nMax, score, rules)
 
 class Zen(Game):
-    def __init__(self, data, difficult, nMin=1, nMax=3, score=0):
+    def __init__(self, data, difficult, nMin=1, nMax=3, score=0, rules=None):
         """
         Creates an Atomas game in Zen mode, where the chance of spawning a 
         proton upon the last move before the game ends is one-half.
@@ -276,5 +390,6 @@ class Zen(Game):
         nMin: int
         nMax: int
         score: int
+        rules: dict
         """
-        super().__init__(data, difficult, nMin, nMax, score)
\ No newline at end of file
+        super().__init__(data, difficult, nMin, nMax, score, rules)
\ No newline at end of file
@@ -1,5 +1,22 @@
 # Gamescreen classes (e.g. selecting mode, pause menu, game over)
-from event_handling import Classic, TimeAttack, Geneva, Zen
+import sys, time
+
+def loadModes(data):
+    """
+    Imports the game mode classes on first use, so that the mode selection 
+    screen can be shown without loading the rest of the game, and returns 
+    them keyed by the key that selects each mode.
+
+    data: Struct
+    """
+    firstLoad = 'event_handling' not in sys.modules
+    start = time.perf_counter()
+    import event_handling
+    if firstLoad and data.startupProfile:
+        print('startup: load game modes %.1f ms' % 
+            ((time.perf_counter() - start) * 1000), file=sys.stderr)
+    return {'c': event_handling.Classic, 't': event_handling.TimeAttack,
+        'g': event_handling.Geneva, 'z': event_handling.Zen}
 
 class Gamescreen(object):
     def __init__(self): pass
@@ -21,14 +38,8 @@ class ModeSelect(Gamescreen):
         event: obj
         data: Struct
         """
-        if event.keysym == 'c':
-            data.screen = Classic(data, False)
-        elif event.keysym == 't':
-            data.screen = TimeAttack(data, False)
-        elif event.keysym == 'g':
-            data.screen = Geneva(data, False)
-        elif event.keysym == 'z':
-            data.screen = Zen(data, False)
+        if event.keysym in ('c', 't', 'g', 'z'):
+            data.screen = loadModes(data)[event.keysym](data, False)
 
     def draw(self, canvas, data):
         """
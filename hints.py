@@ -0,0 +1,261 @@
+# Hint engine classes (e.g. board snapshots, anytime search, worker thread)
+from core_graphics import Atom, Proton, Electron, Neutrino, Luxon
+import queue, threading, time
+
+MAX_ELEMS = 18
+GAME_OVER_PENALTY = 1000
+
+class Cancelled(Exception): pass
+
+def snapshot(game):
+    """
+    Returns an immutable copy of the current position of a game, so that it
+    can be searched on another thread while the gameboard keeps changing.
+    Atoms are stored as their atomic number and protons as 'p'; the center
+    piece may also be an electron ('e'), neutrino ('n') or luxon ('l'). The
+    game's spawn rates, and whether it spawns luxons instead of protons, are 
+    kept so that the lookahead matches them.
+
+    game: Game
+    """
+    elems = tuple(elem.n if isinstance(elem, Atom) else 'p'
+        for elem in game.board.elems)
+    center = game.board.center
+    if isinstance(center, Atom): token = center.n
+    elif isinstance(center, Electron): token = 'e'
+    elif isinstance(center, Neutrino): token = 'n'
+    elif isinstance(center, Luxon): token = 'l'
+    else: token = 'p'
+    return (elems, token, game.nMin, game.nMax, game.protonRate,
+        game.electronRate, game.spawnsLuxons)
+
+def symmetricCount(elems, i):
+    """
+    Returns the number of pairs of identical atoms spaced symmetrically around
+    the proton at index i.
+
+    elems: tuple
+    i: int
+    """
+    count = 0
+    while count < (len(elems) - 1) // 2:
+        left = elems[(i - count - 1) % len(elems)]
+        right = elems[(i + count + 1) % len(elems)]
+        if left == 'p' or left != right: break
+        count += 1
+    return count
+
+def resolveFusions(elems):
+    """
+    Fuses atoms around every proton until no more fusions are possible,
+    returning the resulting ring and the score gained. The ring may come back
+    rotated, which does not change the position.
+
+    elems: tuple
+    """
+    gained, fused = 0, True
+    while fused:
+        fused = False
+        for i, elem in enumerate(elems):
+            if elem != 'p': continue
+            count = symmetricCount(elems, i)
+            if count == 0: continue
+            if count == 1: n = elems[i - 1] + 1
+            else:
+                n = max(elems[(i + j) % len(elems)]
+                    for j in range(1, count + 1)) + count
+            rest = len(elems) - 2*count - 1
+            elems = (n,) + tuple(elems[(i + count + 1 + j) % len(elems)]
+                for j in range(rest))
+            gained, fused = gained + 10 * count, True
+            break
+    return elems, gained
+
+def legalMoves(elems, center):
+    """
+    Returns every move available for the given center piece: ('insert', k)
+    places it before the element at index k, while ('target', k) applies an
+    electron to the element or a neutrino or luxon to the atom at index k.
+    If there is nothing to target, the only move is ('respawn', 0), which 
+    swaps the center piece for a new one.
+
+    elems: tuple
+    center: int or str
+    """
+    if center in ('e', 'n', 'l'):
+        moves = [('target', k) for k, elem in enumerate(elems)
+            if center == 'e' or elem != 'p']
+        return moves if moves else [('respawn', 0)]
+    return [('insert', k) for k in range(max(1, len(elems)))]
+
+def applyMove(elems, center, move):
+    """
+    Plays a move on a snapshot, returning the resulting ring, the score gained
+    and the next center piece if it is known (None if it will be spawned).
+
+    elems: tuple
+    center: int or str
+    move: tuple
+    """
+    kind, k = move
+    if kind == 'respawn':
+        return elems, 0, None
+    elif kind == 'insert':
+        elems, nextCenter = elems[:k] + (center,) + elems[k:], None
+    elif center == 'e':
+        elems, nextCenter = elems[:k] + elems[k+1:], elems[k]
+    elif center == 'n':
+        return elems, 0, elems[k]
+    else:
+        elems, nextCenter = elems[:k] + ('p',) + elems[k+1:], None
+    elems, gained = resolveFusions(elems)
+    return elems, gained, nextCenter
+
+def spawnOdds(nMin, nMax, protonRate, electronRate, spawnsLuxons):
+    """
+    Returns the chance of each piece being spawned next, with luxons in place
+    of protons if the game spawns them. Electrons and neutrinos are left out 
+    of the lookahead.
+
+    nMin: int
+    nMax: int
+    protonRate: int
+    electronRate: int
+    spawnsLuxons: bool
+    """
+    atoms, pieces = range(nMin, nMax + 1), 60 - electronRate
+    odds = [(protonRate / pieces, 'l' if spawnsLuxons else 'p')]
+    odds += [((pieces - protonRate) / pieces / len(atoms), n) for n in atoms]
+    return odds
+
+class HintSearch(object):
+    def __init__(self, position, deadline=None, cancelled=None):
+        """
+        Creates a depth-limited expectimax search over a board snapshot, which
+        stops early once the deadline passes or the cancel event is set.
+
+        position: tuple
+        deadline: float
+        cancelled: threading.Event
+        """
+        self.elems, self.center = position[:2]
+        self.odds = spawnOdds(*position[2:])
+        self.deadline, self.cancelled = deadline, cancelled
+
+    def checkTime(self):
+        """
+        Stops the search by raising Cancelled once the hint is no longer 
+        needed or the deadline has passed.
+        """
+        if self.cancelled != None and self.cancelled.is_set():
+            raise Cancelled()
+        if self.deadline != None and time.perf_counter() > self.deadline:
+            raise Cancelled()
+
+    def value(self, elems, center, depth):
+        """
+        Returns the best expected score reachable from a position within the
+        given number of moves.
+
+        elems: tuple
+        center: int or str
+        depth: int
+        """
+        return max([self.moveValue(elems, center, move, depth)
+            for move in legalMoves(elems, center)], default=-len(elems))
+
+    def moveValue(self, elems, center, move, depth):
+        """
+        Returns the expected score of playing a move, looking depth - 1 moves
+        further ahead.
+
+        elems: tuple
+        center: int or str
+        move: tuple
+        depth: int
+        """
+        self.checkTime()
+        elems, gained, nextCenter = applyMove(elems, center, move)
+        if len(elems) > MAX_ELEMS: return gained - GAME_OVER_PENALTY
+        if depth <= 1: return gained - len(elems)
+        if nextCenter != None:
+            return gained + self.value(elems, nextCenter, depth - 1)
+        return gained + sum(p * self.value(elems, piece, depth - 1)
+            for p, piece in self.odds)
+
+    def bestMove(self, depth):
+        """
+        Returns the move with the highest expected score at the given depth.
+
+        depth: int
+        """
+        best, bestValue = None, None
+        for move in legalMoves(self.elems, self.center):
+            value = self.moveValue(self.elems, self.center, move, depth)
+            if bestValue == None or value > bestValue:
+                best, bestValue = move, value
+        return best
+
+class HintEngine(object):
+    def __init__(self, budget=2.0, maxDepth=4):
+        """
+        Creates a hint engine that searches the current position on a worker
+        thread, deepening one move at a time until the latency budget (in
+        seconds) runs out, and publishes the best move found so far.
+
+        budget: float
+        maxDepth: int
+        """
+        self.budget, self.maxDepth = budget, maxDepth
+        self.results = queue.Queue()
+        self.cancelled = None
+        self.position = None
+        self.hint = None
+
+    def start(self, position):
+        """
+        Cancels any running search and starts searching the given position.
+
+        position: tuple
+        """
+        self.cancel()
+        self.position = position
+        self.cancelled = threading.Event()
+        worker = threading.Thread(target=self.search,
+            args=(position, self.cancelled), daemon=True)
+        worker.start()
+
+    def cancel(self):
+        """
+        Stops the running search and discards its hint.
+        """
+        if self.cancelled != None: self.cancelled.set()
+        self.cancelled, self.position, self.hint = None, None, None
+
+    def search(self, position, cancelled):
+        """
+        Runs an anytime iterative deepening search on the worker thread,
+        publishing the best move after each completed depth.
+
+        position: tuple
+        cancelled: threading.Event
+        """
+        deadline = time.perf_counter() + self.budget
+        search = HintSearch(position, deadline, cancelled)
+        try:
+            for depth in range(1, self.maxDepth + 1):
+                move = search.bestMove(depth)
+                if move == None: return
+                self.results.put((cancelled, move))
+        except Cancelled: pass
+
+    def poll(self):
+        """
+        Collects results published by the worker thread without blocking and
+        returns the latest hint for the current position.
+        """
+        while True:
+            try: cancelled, move = self.results.get_nowait()
+            except queue.Empty: break
+            if cancelled is self.cancelled: self.hint = move
+        return self.hint